@@ -0,0 +1,24 @@
+# Build a system image with HllSets and its hot methods precompiled, so a fresh
+# Julia process (including one started by juliacall) skips parsing and JIT.
+#
+# Requires PackageCompiler in the default environment:
+#
+#     julia -e 'using Pkg; Pkg.add("PackageCompiler")'
+#     julia core/HllSets/build_sysimage.jl
+#
+# The image is written to core/HllSets/hllsets_sys.so. hllset_wrapper.py uses it
+# only when HLLSETS_SYSIMAGE points at it (and HLLSETS_PATH is unset). Build it
+# with the same Julia version juliacall runs, and rebuild after changing src/.
+
+using Pkg
+using PackageCompiler
+
+Pkg.activate(@__DIR__)
+Pkg.instantiate()
+
+create_sysimage(
+    ["HllSets"];
+    project = @__DIR__,
+    sysimage_path = joinpath(@__DIR__, "hllsets_sys.so"),
+    precompile_execution_file = joinpath(@__DIR__, "precompile_hllsets.jl"),
+)
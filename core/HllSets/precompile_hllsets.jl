@@ -0,0 +1,27 @@
+# Workload run by build_sysimage.jl: every method called here is compiled into
+# the system image for the argument types used by hllset_wrapper.py.
+
+using HllSets
+
+for P in (10, 14)
+    a = HllSet(P)
+    b = HllSet(P)
+    add!(a, "element")
+    add!(a, 42)
+    add!(a, 4.2)
+    add!(b, ["element_$i" for i in 1:100])
+
+    count(a)
+    union(a, b)
+    union_into!(HllSet(P), a, b)
+    union_many([a, b])
+    intersect(a, b)
+    intersect_into!(HllSet(P), a, b)
+    diff(a, b)
+    set_comp(a, b)
+    bss_counts(a, b)
+    bss_many(a, [b, a])
+    diff_counts(a, b)
+    isequal(a, b)
+    id(a)
+end
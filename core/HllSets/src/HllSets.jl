@@ -44,7 +44,7 @@ module HllSets
     include("constants.jl")
     using SHA 
 
-    export HllSet, add!, count, union, intersect, diff, isequal, isempty, id, delta, getbin, getzeros, maxidx, match, cosine, dump, restore, to_binary_tensor, flatten_tensor, tensor_to_string, string_to_tensor, binary_tensor_to_hllset, set_xor, set_comp, set_added, set_deleted
+    export HllSet, add!, count, union, union_into!, union_many, intersect, intersect_into!, diff, isequal, isempty, id, delta, getbin, getzeros, maxidx, match, cosine, dump, restore, to_binary_tensor, flatten_tensor, tensor_to_string, string_to_tensor, binary_tensor_to_hllset, set_xor, set_comp, set_comp!, set_added, set_deleted, bss_counts, bss_many, diff_counts
 
     struct HllSet{P}
         counts::Vector{UInt32}
@@ -101,20 +101,46 @@ module HllSets
     function Base.union!(dest::HllSet{P}, src::HllSet{P}) where {P}
         _validate_compatible(dest, src)
 
-        @inbounds for i in 1:length(dest.counts)
-            dest.counts[i] = dest.counts[i] .| src.counts[i]
+        d, s = dest.counts, src.counts
+        @inbounds @simd for i in eachindex(d, s)
+            d[i] |= s[i]
         end
         return dest
     end
 
     function Base.union(x::HllSet{P}, y::HllSet{P}) where {P} 
+        return union_into!(HllSet{P}(), x, y)
+    end
+
+    """
+        union_many(sets::AbstractVector{HllSet{P}}) where {P}
+
+    Compute union of all HLL sets, merging each one into a single new HLL set.
+    """
+    function union_many(sets::AbstractVector{HllSet{P}}) where {P}
+        isempty(sets) && throw(ArgumentError("union_many needs at least one HllSet"))
+
+        dest = HllSet{P}()
+        for x in sets
+            union!(dest, x)
+        end
+        return dest
+    end
+
+    """
+        union_into!(dest::HllSet{P}, x::HllSet{P}, y::HllSet{P}) where {P}
+
+    Overwrite dest with the union of x and y, reusing its registers. Unlike
+    union!(dest, src), the previous contents of dest are discarded. dest may alias x or y.
+    """
+    function union_into!(dest::HllSet{P}, x::HllSet{P}, y::HllSet{P}) where {P}
         _validate_compatible(x, y)
 
-        z = HllSet{P}()
-        @inbounds for i in 1:length(x.counts)
-            z.counts[i] = x.counts[i] .| y.counts[i]
+        a, b, c = x.counts, y.counts, dest.counts
+        @inbounds @simd for i in eachindex(a, b, c)
+            c[i] = a[i] | b[i]
         end
-        return z
+        return dest
     end
 
     """
@@ -123,13 +149,23 @@ module HllSets
     Compute intersection of two HLL sets.
     """
     function Base.intersect(x::HllSet{P}, y::HllSet{P}) where {P} 
+        return intersect_into!(HllSet{P}(), x, y)
+    end
+
+    """
+        intersect_into!(dest::HllSet{P}, x::HllSet{P}, y::HllSet{P}) where {P}
+
+    Overwrite dest with the intersection of x and y, reusing its registers. The
+    previous contents of dest are discarded. dest may alias x or y.
+    """
+    function intersect_into!(dest::HllSet{P}, x::HllSet{P}, y::HllSet{P}) where {P}
         _validate_compatible(x, y)
 
-        z = HllSet{P}()
-        @inbounds for i in 1:length(x.counts)
-            z.counts[i] = x.counts[i] .& y.counts[i]
+        a, b, c = x.counts, y.counts, dest.counts
+        @inbounds @simd for i in eachindex(a, b, c)
+            c[i] = a[i] & b[i]
         end
-        return z
+        return dest
     end
 
     """
@@ -139,10 +175,6 @@ module HllSets
     """
     function Base.diff(hll_1::HllSet{P}, hll_2::HllSet{P}) where {P}
         _validate_compatible(hll_1, hll_2)
-        
-        n = HllSet{P}()
-        d = HllSet{P}()
-        r = HllSet{P}()
 
         d = set_comp(hll_1, hll_2)
         n = set_comp(hll_2, hll_1)
@@ -158,13 +190,22 @@ module HllSets
     """
 
     function set_comp(x::HllSet{P}, y::HllSet{P}) where {P} 
+        return set_comp!(HllSet{P}(), x, y)
+    end
+
+    """
+        set_comp!(dest::HllSet{P}, x::HllSet{P}, y::HllSet{P}) where {P}
+
+    Write set_comp(x, y) into dest, reusing its registers. dest may alias x or y.
+    """
+    function set_comp!(dest::HllSet{P}, x::HllSet{P}, y::HllSet{P}) where {P}
         _validate_compatible(x, y)
 
-        z = HllSet{P}()
-        @inbounds for i in 1:length(x.counts)
-            z.counts[i] = .~y.counts[i] .& x.counts[i]
+        a, b, c = x.counts, y.counts, dest.counts
+        @inbounds @simd for i in eachindex(a, b, c)
+            c[i] = ~b[i] & a[i]
         end
-        return z
+        return dest
     end
 
     """
@@ -175,8 +216,9 @@ module HllSets
     function set_xor(x::HllSet{P}, y::HllSet{P}) where {P} 
         length(x.counts) == length(y.counts) || throw(ArgumentError("HllSet{P} must have same size"))
         z = HllSet{P}()
-        @inbounds for i in 1:length(x.counts)
-            z.counts[i] = xor.(x.counts[i], (y.counts[i]))
+        a, b, c = x.counts, y.counts, z.counts
+        @inbounds @simd for i in eachindex(a, b, c)
+            c[i] = xor(a[i], b[i])
         end
         return z
     end
@@ -224,8 +266,70 @@ module HllSets
     Estimate the cardinality of the HLL set.
     """
     function Base.count(x::HllSet{P}) where {P}
+        return estimate(x, harmonic_sum(i -> x.counts[i], length(x.counts)))
+    end
+
+    """
+        bss_counts(a::HllSet{P}, b::HllSet{P}) where {P}
+
+    Estimate (|B|, |A∩B|, |A∖B|) straight from the registers, without
+    materializing the intersection and difference HLL sets.
+    """
+    function bss_counts(a::HllSet{P}, b::HllSet{P}) where {P}
+        _validate_compatible(a, b)
+
+        x, y = a.counts, b.counts
+        n = length(x)
+        count_b = estimate(b, harmonic_sum(i -> y[i], n))
+        count_i = estimate(b, harmonic_sum(i -> x[i] & y[i], n))
+        count_d = estimate(b, harmonic_sum(i -> x[i] & ~y[i], n))
+        return (count_b, count_i, count_d)
+    end
+
+    """
+        bss_many(a::HllSet{P}, bs::AbstractVector{HllSet{P}}) where {P}
+
+    BSS metrics from a to every set in bs, computed across threads. Returns an
+    N×2 matrix whose k-th row is (τ, ρ) = (|A∩B|/|B|, |A∖B|/|B|) for bs[k], or
+    zeros when bs[k] is empty.
+    """
+    function bss_many(a::HllSet{P}, bs::AbstractVector{HllSet{P}}) where {P}
+        metrics = zeros(Float64, length(bs), 2)
+        Threads.@threads for k in eachindex(bs)
+            count_b, count_i, count_d = bss_counts(a, bs[k])
+            if count_b != 0
+                metrics[k, 1] = count_i / count_b
+                metrics[k, 2] = count_d / count_b
+            end
+        end
+        return metrics
+    end
+
+    """
+        diff_counts(hll_1::HllSet{P}, hll_2::HllSet{P}) where {P}
+
+    Estimate the cardinalities of the (deleted, retained, new) sets returned by
+    diff, without materializing them.
+    """
+    function diff_counts(hll_1::HllSet{P}, hll_2::HllSet{P}) where {P}
+        _validate_compatible(hll_1, hll_2)
+
+        x, y = hll_1.counts, hll_2.counts
+        n = length(x)
+        count_d = estimate(hll_1, harmonic_sum(i -> x[i] & ~y[i], n))
+        count_r = estimate(hll_1, harmonic_sum(i -> x[i] & y[i], n))
+        count_n = estimate(hll_1, harmonic_sum(i -> y[i] & ~x[i], n))
+        return (DEL = count_d, RET = count_r, NEW = count_n)
+    end
+
+    # Sum of 2^-maxidx over n registers, where register(i) yields the i-th register value
+    function harmonic_sum(register, n::Int)
+        return sum(i -> 1 / 1 << maxidx(register(i)), 1:n)
+    end
+
+    function estimate(x::HllSet{P}, harmonic_sum) where {P}
         # Harmonic mean estimates cardinality per bin. There are 2^P bins
-        harmonic_mean = sizeof(x) / sum(1 / 1 << maxidx(i) for i in x.counts)
+        harmonic_mean = sizeof(x) / harmonic_sum
         biased_estimate = α(x) * sizeof(x) * harmonic_mean
         return round(Int, biased_estimate - bias(x, biased_estimate))
     end
@@ -239,9 +343,7 @@ module HllSets
 
     function getbin(x::Int; P::Int=10) 
         # Increasing P by 1 to compensate BitVector size that is of size 64
-        x = x >>> (8 * sizeof(UInt) - (P + 1)) + 1
-        str = replace(string(x, base = 16), "0x" => "")
-        return parse(Int, str, base = 16)
+        return x >>> (8 * sizeof(UInt) - (P + 1)) + 1
     end
 
     function getzeros(hll::HllSet{P}, x::Int) where {P}
@@ -329,11 +431,9 @@ module HllSets
     """
     function to_binary_tensor(hll::HllSet{P}) where {P}
         tensor = zeros(Bool, 2^P, 32)
-        for i in 1:2^P
-            binary_str = bitstring(hll.counts[i])
-            for j in 1:32
-                tensor[i, j] = binary_str[j] == '1'
-            end
+        # Column j holds bit (32 - j), same most-significant-first order as bitstring
+        @inbounds for j in 1:32, i in 1:2^P
+            tensor[i, j] = (hll.counts[i] >> (32 - j)) & 1 == 1
         end
         return tensor
     end
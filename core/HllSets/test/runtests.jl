@@ -1,6 +1,105 @@
 using HllSets
 using Test
 
+# Reference implementations from before the register-level rewrites
+function reference_count(x::HllSet{P}) where {P}
+    harmonic_mean = sizeof(x) / sum(1 / 1 << maxidx(i) for i in x.counts)
+    biased_estimate = HllSets.α(x) * sizeof(x) * harmonic_mean
+    return round(Int, biased_estimate - HllSets.bias(x, biased_estimate))
+end
+
+function reference_to_binary_tensor(hll::HllSet{P}) where {P}
+    tensor = zeros(Bool, 2^P, 32)
+    for i in 1:2^P
+        binary_str = bitstring(hll.counts[i])
+        for j in 1:32
+            tensor[i, j] = binary_str[j] == '1'
+        end
+    end
+    return tensor
+end
+
+function reference_getbin(x::Int; P::Int=10)
+    x = x >>> (8 * sizeof(UInt) - (P + 1)) + 1
+    str = replace(string(x, base = 16), "0x" => "")
+    return parse(Int, str, base = 16)
+end
+
+function make_set(P, range)
+    hll = HllSet(P)
+    for i in range
+        add!(hll, "element_$i")
+    end
+    return hll
+end
+
 @testset "HllSets.jl" begin
-    # Write your tests here.
+    for P in (10, 14)
+        a = make_set(P, 1:1000)
+        b = make_set(P, 500:1500)
+        c = make_set(P, 1200:3000)
+        blank = HllSet(P)
+
+        @testset "count (P=$P)" begin
+            for x in (a, b, c)
+                @test isapprox(count(x), reference_count(x); atol=1)
+            end
+        end
+
+        @testset "bss_counts (P=$P)" begin
+            for (x, y) in ((a, b), (b, a), (a, c), (a, blank))
+                @test bss_counts(x, y) == (count(y), count(intersect(x, y)), count(diff(x, y).DEL))
+            end
+        end
+
+        @testset "diff_counts (P=$P)" begin
+            for (x, y) in ((a, b), (b, c), (a, blank))
+                d = diff(x, y)
+                @test Tuple(diff_counts(x, y)) == (count(d.DEL), count(d.RET), count(d.NEW))
+            end
+        end
+
+        @testset "bss_many (P=$P)" begin
+            bs = [b, c, blank]
+            metrics = bss_many(a, bs)
+            @test size(metrics) == (3, 2)
+            for (k, y) in enumerate(bs)
+                count_b, count_i, count_d = bss_counts(a, y)
+                expected = count_b == 0 ? (0.0, 0.0) : (count_i / count_b, count_d / count_b)
+                @test (metrics[k, 1], metrics[k, 2]) == expected
+            end
+        end
+
+        @testset "to_binary_tensor (P=$P)" begin
+            hll = HllSet(P)
+            hll.counts .= rand(UInt32, 2^P)
+            @test to_binary_tensor(hll) == reference_to_binary_tensor(hll)
+            @test to_binary_tensor(a) == reference_to_binary_tensor(a)
+        end
+
+        @testset "getbin (P=$P)" begin
+            for x in rand(0:typemax(Int), 1000)
+                @test getbin(x; P=P) == reference_getbin(x; P=P)
+            end
+        end
+
+        @testset "in-place set operations (P=$P)" begin
+            @test isequal(union_into!(HllSet(P), a, b), union(a, b))
+            @test isequal(intersect_into!(HllSet(P), a, b), intersect(a, b))
+            @test isequal(set_comp!(HllSet(P), a, b), set_comp(a, b))
+
+            # The _into! forms discard dest; the 2-arg union! accumulates into it
+            @test isequal(union_into!(copy!(HllSet(P), c), a, b), union(a, b))
+            @test isequal(union!(copy!(HllSet(P), c), a), union(c, a))
+
+            # dest may alias an operand
+            @test isequal(union_into!(copy!(HllSet(P), a), a, b), union(a, b))
+        end
+
+        @testset "union_many (P=$P)" begin
+            @test isequal(union_many([a, b, c]), union(union(a, b), c))
+            @test isequal(union_many([a]), a)
+            @test_throws ArgumentError union_many(HllSet{P}[])
+        end
+    end
 end
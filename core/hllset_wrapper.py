@@ -3,12 +3,24 @@ HllSet Wrapper for Julia HllSets integration.
 Provides BSS_τ (coverage) and BSS_ρ (exclusion) metrics for set operations.
 """
 
-from julia import Main
 import os
 import numpy as np
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any
-from dataclasses import dataclass
+from itertools import chain
+from operator import methodcaller
+from functools import lru_cache
+from typing import Optional, Tuple, List, Dict, Any, NamedTuple
+
+# Use a prebuilt HllSets system image (see HllSets/build_sysimage.jl) only when
+# HLLSETS_SYSIMAGE points at one and HLLSETS_PATH does not ask for a source file.
+# juliacall reads this setting when it starts Julia, so it must be set before the import.
+hllsets_sysimage = os.getenv("HLLSETS_SYSIMAGE")
+if hllsets_sysimage and not os.getenv("HLLSETS_PATH"):
+    if not os.path.exists(hllsets_sysimage):
+        raise EnvironmentError(f"HLLSETS_SYSIMAGE points at a missing file: {hllsets_sysimage}")
+    os.environ.setdefault("PYTHON_JULIACALL_SYSIMAGE", hllsets_sysimage)
+
+from juliacall import Main as jl
 
 # Auto-detect HllSets.jl path if not set
 hllsets_path = os.getenv("HLLSETS_PATH")
@@ -25,21 +37,105 @@ if not hllsets_path:
             f"HLLSETS_PATH environment variable is not set and HllSets.jl not found at {hllsets_jl}"
         )
 
-# Load the HllSets.jl file
-Main.include(hllsets_path)
-Main.using(".HllSets")
+# Load the HllSets.jl file, unless it is already compiled into the system image
+_HLLSETS_PKGID = 'Base.PkgId(Base.UUID("f955276c-852f-4e19-9c8c-7b5b96acb3fc"), "HllSets")'
+
+if jl.seval(f"haskey(Base.loaded_modules, {_HLLSETS_PKGID})"):
+    jl.seval(f"const HllSets = Base.loaded_modules[{_HLLSETS_PKGID}]")
+    _missing = jl.seval("""
+        [String(n) for n in (:union_into!, :intersect_into!, :set_comp!, :union_many,
+                             :bss_counts, :bss_many, :diff_counts) if !isdefined(HllSets, n)]
+    """)
+    if len(_missing):
+        raise EnvironmentError(
+            f"The HllSets system image is out of date (missing {', '.join(_missing)}); "
+            "rebuild it with `julia core/HllSets/build_sysimage.jl`"
+        )
+else:
+    jl.include(hllsets_path)
+jl.seval("using .HllSets")
+
+# Resolve the Julia functions once instead of on every call
+_HLLSET = jl.HllSet
+_ADD = getattr(jl, "add!")
+_COUNT = jl.count
+_INTERSECT = jl.intersect
+_DIFF = jl.diff
+_UNION = jl.union
+_UNION_INTO = getattr(jl, "union_into!")
+_UNION_MANY = jl.union_many
+_INTERSECT_INTO = getattr(jl, "intersect_into!")
+_SET_COMP = jl.set_comp
+_ID = jl.id
+_BSS_COUNTS = jl.bss_counts
+_BSS_MANY = jl.bss_many
+_DIFF_COUNTS = jl.diff_counts
+
+_DECODE = methodcaller("decode")
+
+# Typed add! entry points for a concrete HllSet{P} (see make_hllset_class): the
+# element arrives in Julia unconverted and both arguments are converted straight
+# to concrete types, so add! dispatches to the specialized method
+jl.seval("using PythonCall")
+_typed_add = jl.seval("""
+    _typed_add(::Type{T}, ::Type{H}) where {T, H <: HllSet} =
+        PythonCall.pyfunc((h, x) -> (add!(pyconvert(H, h), pyconvert(T, x)); nothing))
+""")
+# Ints beyond Int64 become BigInt, as with the generic conversion used by add_batch
+_INT = jl.seval("Union{Int64, BigInt}")
+
+# Convert Python containers recursively, as pyjulia did: a list becomes a Vector
+# and a set a Set, so add! inserts their items one by one, while a tuple stays a
+# single element hashed by value. Left to the default conversion they would be
+# wrapped as PyList/PySet and hashed once through Python's per-process salted hash()
+jl.seval("""
+    function _pyelement(x::Py)
+        if pyisinstance(x, pybuiltins.list)
+            return [_pyelement(v) for v in x]
+        elseif pyisinstance(x, pybuiltins.tuple)
+            return Tuple(_pyelement(v) for v in x)
+        elseif pyisinstance(x, pybuiltins.set) || pyisinstance(x, pybuiltins.frozenset)
+            return Set(_pyelement(v) for v in x)
+        else
+            return pyconvert(Any, x)
+        end
+    end
+""")
+_ADD_CONTAINER = jl.seval("""
+    PythonCall.pyfunc((h, x) -> (add!(pyconvert(HllSet, h), _pyelement(x)); nothing))
+""")
+_ADD_CONTAINERS = {
+    list: _ADD_CONTAINER,
+    tuple: _ADD_CONTAINER,
+    set: _ADD_CONTAINER,
+    frozenset: _ADD_CONTAINER,
+}
+
+# Batch insert: the Python list crosses into Julia once and is iterated there
+_ADD_BATCH = jl.seval("""
+    PythonCall.pyfunc() do h, xs
+        hll = pyconvert(HllSet, h)
+        for x in xs
+            add!(hll, _pyelement(x))
+        end
+    end
+""")
+
+# Collects the Julia HllSets of a Python list into a concretely typed Vector
+_HLL_VECTOR = jl.seval("""
+    PythonCall.pyfunc(xs -> Py([pyconvert(Any, x) for x in xs]))
+""")
 
 
 # if not hllsets_path:
 #     raise EnvironmentError("HLLSETS_PATH environment variable is not set")
 
 # # Load the HllSets.jl file
-# Main.include(hllsets_path)
-# Main.using(".HllSets")
+# jl.include(hllsets_path)
+# jl.seval("using .HllSets")
 
 
-@dataclass
-class BSSMetrics:
+class BSSMetrics(NamedTuple):
     """BSS metrics for HllSet operations."""
     tau: float  # Coverage: |A∩B| / |B|
     rho: float  # Exclusion: |A∖B| / |B|
@@ -53,6 +149,12 @@ class HllSet:
     BSS_ρ (rho): Exclusion metric = |A∖B| / |B|
     """
     
+    __slots__ = ('P', 'tau', 'rho', 'seed', 'hll', '_count_cache', '_id_cache')
+    
+    # Overridden by classes from make_hllset_class for a fixed precision
+    _julia_type: Any = None
+    _add_typed: Dict[type, Any] = _ADD_CONTAINERS
+    
     def __init__(self, P: int = 10, tau: float = 0.7, rho: float = 0.21, seed: int = 42):
         """
         Initialize an HllSet with precision P and BSS metrics.
@@ -67,34 +169,51 @@ class HllSet:
         self.tau = tau
         self.rho = rho
         self.seed = seed
-        self.hll = Main.HllSet(P)  # Create a new HllSet in Julia
+        # Create a new HllSet in Julia
+        self.hll = _HLLSET(P) if self._julia_type is None else self._julia_type()
+        self._count_cache: Optional[float] = None
+        self._id_cache: Optional[str] = None
+
+    def _invalidate(self) -> None:
+        """Drop cached results after the Julia registers change."""
+        self._count_cache = None
+        self._id_cache = None
 
     def add(self, element: Any) -> None:
         """Add an element to the HllSet."""
-        add_func = getattr(Main, "add!")
-        add_func(self.hll, element)
+        self._add_typed.get(type(element), _ADD)(self.hll, element)
+        self._invalidate()
 
     def add_batch(self, elements: list) -> None:
-        """Add a batch of elements to the HllSet."""
-        add_func = getattr(Main, "add!")
-        for element in elements:
-            add_func(self.hll, element)
+        """Add a batch of elements to the HllSet in a single Julia call."""
+        _ADD_BATCH(self.hll, elements)
+        self._invalidate()
 
     def count(self) -> float:
-        """Estimate the cardinality of the HllSet."""
-        return float(Main.count(self.hll))
+        """Estimate the cardinality of the HllSet (cached until the next add)."""
+        if self._count_cache is None:
+            self._count_cache = float(_COUNT(self.hll))
+        return self._count_cache
     
-    def get_counts(self):
+    def get_counts(self, copy: bool = False) -> np.ndarray:
         """
         Get the counts vector from the Julia HllSet as a NumPy array.
         
+        By default the array is a zero-copy view of the Julia register
+        memory: it reflects later additions, and writing to it modifies
+        the HllSet without refreshing the cached count and id. Pass
+        copy=True for an independent snapshot.
+        
+        Args:
+            copy: Return a copy instead of a view of the Julia registers
+        
         Returns:
             NumPy array of UInt32 counts from the internal HllSet structure
         """
-        # Access the counts field directly from the Julia object
-        counts = self.hll.counts
-        # Convert Julia vector to NumPy array
-        return np.array(counts, dtype=np.uint32)
+        # juliacall exposes the Julia vector through the array protocol,
+        # so NumPy wraps the register memory without copying it
+        counts = np.asarray(self.hll.counts)
+        return counts.copy() if copy else counts
 
     def _calculate_bss_metrics(self, other: 'HllSet') -> BSSMetrics:
         """
@@ -109,19 +228,13 @@ class HllSet:
         Returns:
             BSSMetrics with calculated tau and rho
         """
-        count_b = float(other.count())
+        # |B|, |A∩B| and |A∖B| in one Julia call, without building the
+        # intersection and difference HllSets
+        count_b, intersection_count, deleted_count = _BSS_COUNTS(self.hll, other.hll)
         
         if count_b == 0:
             return BSSMetrics(tau=0.0, rho=0.0)
         
-        # Calculate intersection - intersect returns an HllSet, need to count it
-        intersection_hll = Main.intersect(self.hll, other.hll)
-        intersection_count = float(Main.count(intersection_hll))
-        
-        # Calculate difference - returns (deleted, retained, new)
-        deleted_hll, retained_hll, new_hll = Main.diff(self.hll, other.hll)
-        deleted_count = float(Main.count(deleted_hll))
-        
         # BSS_τ(A→B) = |A∩B| / |B|
         tau = intersection_count / count_b
         
@@ -130,7 +243,7 @@ class HllSet:
         
         return BSSMetrics(tau=tau, rho=rho)
 
-    def union(self, other: 'HllSet') -> 'HllSet':
+    def union(self, other: 'HllSet', out: Optional['HllSet'] = None) -> 'HllSet':
         """
         Perform union with another HllSet.
         
@@ -138,12 +251,19 @@ class HllSet:
         
         Args:
             other: Another HllSet
+            out: Existing HllSet to overwrite with the result, reusing its
+                 Julia registers instead of allocating new ones
             
         Returns:
-            New HllSet with union result and combined metrics
+            New HllSet (or out) with union result and combined metrics
         """
-        result = Main.union(self.hll, other.hll)
-        union_set = HllSet.from_julia(result, self.P)
+        if out is None:
+            result = _UNION(self.hll, other.hll)
+            union_set = type(self).from_julia(result, self.P)
+        else:
+            _UNION_INTO(out.hll, self.hll, other.hll)
+            out._invalidate()
+            union_set = out
         
         # Calculate combined metrics
         union_set.tau = min(self.tau, other.tau)
@@ -151,7 +271,37 @@ class HllSet:
         
         return union_set
 
-    def intersection(self, other: 'HllSet') -> 'HllSet':
+    @classmethod
+    def union_many(cls, sets: List['HllSet']) -> 'HllSet':
+        """
+        Perform union of many HllSets in one Julia call.
+        
+        Unlike chaining union(), only the result HllSet is allocated.
+        
+        Metrics: tau = min over all sets, rho = max over all sets
+        
+        Args:
+            sets: HllSets to merge, all with the same precision
+            
+        Returns:
+            New HllSet, of the same class as the operands, with union
+            result and combined metrics
+        """
+        if not sets:
+            raise ValueError("union_many needs at least one HllSet")
+        if len({s.P for s in sets}) != 1:
+            raise ValueError("union_many needs HllSets with the same precision P")
+        
+        result = _UNION_MANY(_HLL_VECTOR([s.hll for s in sets]))
+        union_set = type(sets[0]).from_julia(result, sets[0].P)
+        
+        # Calculate combined metrics
+        union_set.tau = min(s.tau for s in sets)
+        union_set.rho = max(s.rho for s in sets)
+        
+        return union_set
+
+    def intersection(self, other: 'HllSet', out: Optional['HllSet'] = None) -> 'HllSet':
         """
         Perform intersection with another HllSet.
         
@@ -159,12 +309,19 @@ class HllSet:
         
         Args:
             other: Another HllSet
+            out: Existing HllSet to overwrite with the result, reusing its
+                 Julia registers instead of allocating new ones
             
         Returns:
-            New HllSet with intersection result and combined metrics
+            New HllSet (or out) with intersection result and combined metrics
         """
-        result = Main.intersect(self.hll, other.hll)
-        intersect_set = HllSet.from_julia(result, self.P)
+        if out is None:
+            result = _INTERSECT(self.hll, other.hll)
+            intersect_set = type(self).from_julia(result, self.P)
+        else:
+            _INTERSECT_INTO(out.hll, self.hll, other.hll)
+            out._invalidate()
+            intersect_set = out
         
         # Calculate combined metrics
         intersect_set.tau = min(self.tau, other.tau)
@@ -184,12 +341,12 @@ class HllSet:
         Returns:
             Tuple of (deleted, retained, new) HllSets with combined metrics
         """
-        deleted, retained, new = Main.diff(self.hll, other.hll)
+        deleted, retained, new = _DIFF(self.hll, other.hll)
         
         # Create HllSets from Julia results
-        deleted_set = HllSet.from_julia(deleted, self.P)
-        retained_set = HllSet.from_julia(retained, self.P)
-        new_set = HllSet.from_julia(new, self.P)
+        deleted_set = type(self).from_julia(deleted, self.P)
+        retained_set = type(self).from_julia(retained, self.P)
+        new_set = type(self).from_julia(new, self.P)
         
         # Apply combined metrics to all results
         combined_tau = min(self.tau, other.tau)
@@ -201,6 +358,22 @@ class HllSet:
         
         return deleted_set, retained_set, new_set
 
+    def difference_counts(self, other: 'HllSet') -> Tuple[float, float, float]:
+        """
+        Estimate the sizes of the difference with another HllSet.
+        
+        Cheaper than difference() when only the cardinalities are needed:
+        the three result HllSets are never built.
+        
+        Args:
+            other: Another HllSet
+            
+        Returns:
+            Tuple of (deleted, retained, new) cardinality estimates
+        """
+        deleted, retained, new = _DIFF_COUNTS(self.hll, other.hll)
+        return float(deleted), float(retained), float(new)
+
     def complement(self, other: 'HllSet') -> 'HllSet':
         """
         Perform complement operation with another HllSet.
@@ -211,8 +384,8 @@ class HllSet:
         Returns:
             New HllSet with complement result
         """
-        result = Main.set_comp(self.hll, other.hll)
-        comp_set = HllSet.from_julia(result, self.P)
+        result = _SET_COMP(self.hll, other.hll)
+        comp_set = type(self).from_julia(result, self.P)
         
         # Calculate BSS metrics for complement
         metrics = self._calculate_bss_metrics(other)
@@ -236,19 +409,49 @@ class HllSet:
         """
         return self._calculate_bss_metrics(other)
 
+    def bss_many(self, others: List['HllSet']) -> np.ndarray:
+        """
+        Calculate BSS metrics from this set to many others in one Julia call.
+        
+        Args:
+            others: Target HllSets, all with the same precision as this one
+            
+        Returns:
+            N×2 array whose i-th row is (tau, rho) for others[i]
+        """
+        if not others:
+            return np.zeros((0, 2))
+        if any(other.P != self.P for other in others):
+            raise ValueError("bss_many needs HllSets with the same precision P")
+        metrics = _BSS_MANY(self.hll, _HLL_VECTOR([other.hll for other in others]))
+        return np.asarray(metrics)
+
     def id(self) -> str:
-        """Get SHA1 hash of the HllSet counts."""
-        return Main.id(self.hll)
+        """Get SHA1 hash of the HllSet counts (cached until the next add)."""
+        if self._id_cache is None:
+            self._id_cache = _ID(self.hll)
+        return self._id_cache
 
     def __eq__(self, other: Any) -> bool:
-        """Compare two HllSets for equality."""
+        """Compare two HllSets for equality by their cached SHA1 ids."""
         if not isinstance(other, HllSet):
             return False
-        return Main.isequal(self.hll, other.hll)
+        return self.id() == other.id()
 
-    def to_binary_tensor(self):
-        """Convert the HllSet to a binary tensor."""
-        return Main.to_binary_tensor(self.hll)
+    def to_binary_tensor(self) -> np.ndarray:
+        """
+        Convert the HllSet to a bit-packed binary tensor.
+        
+        Row i packs the 32 bits of register i, most significant bit first,
+        into 4 bytes: the layout of np.packbits(tensor, axis=1) for the
+        2^P x 32 Boolean tensor of Julia's to_binary_tensor. Recover that
+        tensor with np.unpackbits(packed, axis=1).
+        
+        Returns:
+            uint8 array of shape (2^P, 4)
+        """
+        # The registers already hold the bits; only the byte order changes
+        return self.get_counts().astype('>u4').view(np.uint8).reshape(-1, 4)
 
     @classmethod
     def from_dict(cls, redis_data: Dict[Any, Any], P: int = 10, 
@@ -256,6 +459,11 @@ class HllSet:
         """
         Create an HllSet from Redis hash data.
 
+        Prefer a client created with decode_responses=True, so keys and
+        values already arrive as str. Replies from a bytes client are
+        decoded here; keys and values are expected to be all bytes or
+        all str, as Redis returns them.
+
         Args:
             redis_data: The dictionary returned by redis.hgetall(redis_key)
             P: The precision for the HllSet
@@ -272,10 +480,11 @@ class HllSet:
         # Initialize a new HllSet
         hll = cls(P, tau, rho, seed)
 
-        # Add elements from Redis data to the HllSet
-        for key, value in redis_data.items():
-            hll.add(key.decode() if isinstance(key, bytes) else key)
-            hll.add(value.decode() if isinstance(value, bytes) else value)
+        # Flatten to [key, value, key, value, ...] and add them in one batch
+        elements = list(chain.from_iterable(redis_data.items()))
+        if isinstance(elements[0], bytes):
+            elements = list(map(_DECODE, elements))
+        hll.add_batch(elements)
 
         return hll
 
@@ -295,10 +504,67 @@ class HllSet:
         Returns:
             HllSet wrapper around the Julia object
         """
-        hll = cls(P, tau, rho, seed)
+        # Bypass __init__ so no throwaway Julia HllSet is allocated
+        hll = cls.__new__(cls)
+        hll.P = P
+        hll.tau = tau
+        hll.rho = rho
+        hll.seed = seed
         hll.hll = julia_hll
+        hll._invalidate()
         return hll
 
     def __repr__(self) -> str:
         return (f"HllSet(P={self.P}, count={self.count():.0f}, "
-                f"tau={self.tau:.3f}, rho={self.rho:.3f})")
\ No newline at end of file
+                f"tau={self.tau:.3f}, rho={self.rho:.3f})")
+
+
+@lru_cache(maxsize=None)
+def make_hllset_class(P: int) -> type:
+    """
+    Create an HllSet subclass specialized for a fixed precision P.
+    
+    The concrete Julia type HllSet{P} is bound once, so new sets are built
+    without dispatching on P at runtime, and the typed add! entry points
+    convert straight to HllSet{P}. Results of set operations keep the
+    specialized class. Classes are cached, one per P.
+    
+    Args:
+        P: Precision parameter (number of bits for indexing)
+        
+    Returns:
+        HllSet subclass named HllSet_P{P}
+    """
+    julia_type = jl.seval(f"HllSet{{{P}}}")
+    precision = P
+
+    class SpecializedHllSet(HllSet):
+        __slots__ = ()
+
+        _julia_type = julia_type
+        _add_typed = {
+            **_ADD_CONTAINERS,
+            str: _typed_add(jl.String, julia_type),
+            int: _typed_add(_INT, julia_type),
+            float: _typed_add(jl.Float64, julia_type),
+        }
+
+        def __init__(self, P: int = precision, tau: float = 0.7, rho: float = 0.21, seed: int = 42):
+            if P != precision:
+                raise ValueError(f"{type(self).__name__} is specialized for P={precision}, got P={P}")
+            super().__init__(P, tau, rho, seed)
+
+        @classmethod
+        def from_dict(cls, redis_data: Dict[Any, Any], P: int = precision,
+                      tau: float = 0.7, rho: float = 0.21, seed: int = 42) -> 'HllSet':
+            return super().from_dict(redis_data, P, tau, rho, seed)
+
+        @classmethod
+        def from_julia(cls, julia_hll, P: int = precision, tau: float = 0.7,
+                       rho: float = 0.21, seed: int = 42) -> 'HllSet':
+            if P != precision:
+                raise ValueError(f"{cls.__name__} is specialized for P={precision}, got P={P}")
+            return super().from_julia(julia_hll, P, tau, rho, seed)
+
+    SpecializedHllSet.__name__ = SpecializedHllSet.__qualname__ = f"HllSet_P{P}"
+    return SpecializedHllSet
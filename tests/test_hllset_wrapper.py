@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("juliacall")
+
+from core.hllset_wrapper import HllSet, make_hllset_class  # noqa: E402
+
+
+def make_set(elements, P=10):
+    hll = HllSet(P=P)
+    hll.add_batch(list(elements))
+    return hll
+
+
+def test_add_list_inserts_items():
+    items = [f"element_{i}" for i in range(100)]
+    one_by_one = make_set(items)
+
+    as_list = HllSet(P=10)
+    as_list.add(items)
+    assert as_list == one_by_one
+
+    nested = HllSet(P=10)
+    nested.add_batch([items[:50], set(items[50:])])
+    assert nested == one_by_one
+
+
+def test_bss_many_matches_pairwise_and_checks_precision():
+    a = make_set(f"element_{i}" for i in range(1000))
+    others = [make_set(f"element_{i}" for i in range(500, 1500)), HllSet(P=10)]
+    metrics = a.bss_many(others)
+    assert metrics.shape == (2, 2)
+    for row, other in zip(metrics, others):
+        assert tuple(row) == tuple(a.calculate_bss_to(other))
+
+    with pytest.raises(ValueError):
+        a.bss_many([HllSet(P=12)])
+
+
+def test_count_cache_is_invalidated_by_add():
+    hll = make_set(f"element_{i}" for i in range(100))
+    before = hll.count()
+    assert hll.count() == before
+    hll.add_batch([f"element_{i}" for i in range(100, 1000)])
+    assert hll.count() > before
+    hll.add("element_1000")
+    assert hll.count() == HllSet.from_julia(hll.hll, 10).count()
+
+
+def test_id_cache_and_equality():
+    a = make_set(f"element_{i}" for i in range(100))
+    b = make_set(f"element_{i}" for i in range(100))
+    assert a == b and a.id() == b.id()
+
+    old_id = a.id()
+    a.add("element_100")
+    assert a.id() != old_id
+    assert a != b
+    b.add("element_100")
+    assert a == b
+
+
+def test_make_hllset_class_checks_precision():
+    HllSet12 = make_hllset_class(12)
+    assert make_hllset_class(12) is HllSet12
+    assert HllSet12().P == 12
+
+    with pytest.raises(ValueError):
+        HllSet12(P=10)
+    with pytest.raises(ValueError):
+        HllSet12.from_dict({"key": "value"}, P=10)
+    with pytest.raises(ValueError):
+        HllSet12.from_julia(HllSet(P=10).hll, 10)
+
+    a = HllSet12()
+    a.add_batch(["x", 1, 2.5, 2**70])
+    b = HllSet12()
+    for x in ["x", 1, 2.5, 2**70]:
+        b.add(x)
+    assert a == b
+    assert type(a.union(b)) is HllSet12
+
+
+def test_from_dict_decodes_bytes_replies():
+    data = {f"key_{i}": f"value_{i}" for i in range(100)}
+    as_str = HllSet.from_dict(data)
+    as_bytes = HllSet.from_dict({k.encode(): v.encode() for k, v in data.items()})
+    assert as_bytes == as_str
+
+    with pytest.raises(ValueError):
+        HllSet.from_dict({})
+
+
+def test_to_binary_tensor_is_packed_register_bits():
+    hll = make_set(f"element_{i}" for i in range(1000))
+    packed = hll.to_binary_tensor()
+    assert packed.dtype == np.uint8 and packed.shape == (1024, 4)
+
+    counts = hll.get_counts()
+    bits = np.unpackbits(packed, axis=1).astype(bool)
+    expected = (counts[:, None] >> np.arange(31, -1, -1, dtype=np.uint32)) & 1
+    assert np.array_equal(bits, expected.astype(bool))